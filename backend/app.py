@@ -4,14 +4,77 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 import random
 
-from models import setup_db, Question, Category
+from models import setup_db, database_path, Question, Category
 
 QUESTIONS_PER_PAGE = 10
+DIFFICULTY_LEVELS = range(1, 6)
+DEFAULT_DIFFICULTY = 3
+
+
+# Converts a stored value to an int, returning None when it is missing or not numeric.
+def to_int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# Groups question ids by (category, difficulty). Category 0 holds every question,
+# matching the "ALL" category used by the quiz. Questions without a valid difficulty are skipped,
+# and questions with a missing or non-numeric category only go into category 0.
+def build_difficulty_buckets(questions):
+    buckets = {}
+    for question in questions:
+        difficulty = to_int_or_none(question.difficulty)
+        if difficulty not in DIFFICULTY_LEVELS:
+            continue
+        categories = [0]
+        category_id = to_int_or_none(question.category)
+        if category_id is not None:
+            categories.append(category_id)
+        for category_id in categories:
+            buckets.setdefault((category_id, difficulty), []).append(question.id)
+    return buckets
+
+
+# Moves the difficulty one step up after a correct answer and one step down after a wrong one.
+def next_difficulty(difficulty, previous_correct):
+    if previous_correct is True:
+        difficulty += 1
+    elif previous_correct is False:
+        difficulty -= 1
+    return max(DIFFICULTY_LEVELS[0], min(DIFFICULTY_LEVELS[-1], difficulty))
+
+
+# Picks a random question id from a bucket that is not one of the previous questions.
+def pick_from_bucket(bucket, previous_questions):
+    # A few random draws are usually enough; only filter the bucket once most of it has been played.
+    for _ in range(3):
+        question_id = random.choice(bucket)
+        if question_id not in previous_questions:
+            return question_id
+    remaining = [question_id for question_id in bucket if question_id not in previous_questions]
+    if len(remaining) > 0:
+        return random.choice(remaining)
+    return None
 
 def create_app(test_config=None):
     # create and configure the app
     app = Flask(__name__)
-    setup_db(app)
+    if test_config is None:
+        test_config = {}
+    setup_db(app, database_path=test_config.get('DATABASE_PATH', database_path))
+
+    # The buckets live in this process only, so a create/delete refreshes just the worker that
+    # handled it. The quiz skips ids that no longer exist, but questions added by another
+    # worker are not served here until this one refreshes or restarts.
+    with app.app_context():
+        app.config['DIFFICULTY_BUCKETS'] = build_difficulty_buckets(Question.query.all())
+
+    # Rebuilds the quiz buckets after questions are added or removed. The new map is swapped in
+    # with a single assignment so concurrent quiz requests never see it half built.
+    def refresh_difficulty_buckets(selection):
+        app.config['DIFFICULTY_BUCKETS'] = build_difficulty_buckets(selection)
     
     CORS(app, resources={r"/*": {"origins":"*"}})
 
@@ -137,6 +200,7 @@ def create_app(test_config=None):
                 question.delete()
                 
                 selection = Question.query.all()
+                refresh_difficulty_buckets(selection)
                 formatted_questions = paginate(request, selection)
                 # category_id = request.args.get('category', 1, type=int)
                 # selected_category =  Category.query.get(category_id)
@@ -180,6 +244,7 @@ def create_app(test_config=None):
                 print(f"New Question created with id = {New_question.id}")
                 
                 selection = Question.query.all()
+                refresh_difficulty_buckets(selection)
                 formatted_questions = paginate(request, selection)
                 category_id = request.args.get('category', type=int)
                 if category_id is None:
@@ -243,13 +308,24 @@ def create_app(test_config=None):
     TEST: In the "Play" tab, after a user selects "All" or a category,
     one question at a time is displayed, the user is allowed to answer
     and shown whether they were correct or not.
+
+    When 'difficulty' is given, or 'adaptive' is true, the question is drawn from the
+    precomputed (category, difficulty) bucket instead of loading the whole category.
+    In adaptive mode the difficulty moves up or down based on 'previous_correct', and
+    the returned 'difficulty' should be sent back with the next request.
+    'adaptive' and 'previous_correct' must be booleans and 'difficulty' an integer from 1 to 5.
     """
     @app.route('/quizzes', methods=['POST'])
     def get_quiz_question():
         body = request.get_json()
         previous_questions = body.get('previous_questions', [])
         quiz_category = body.get('category', None)
-        print(quiz_category)
+        difficulty = body.get('difficulty', None)
+        adaptive = body.get('adaptive', False)
+        if not isinstance(adaptive, bool):
+            abort(422)
+        if adaptive or difficulty is not None:
+            return get_quiz_question_by_difficulty(body, previous_questions, quiz_category, difficulty, adaptive)
         try:
             if quiz_category is None or quiz_category['id'] == 0:
                 questions = Question.query.all()
@@ -270,6 +346,50 @@ def create_app(test_config=None):
                 })
         except:
             abort(422)
+
+    # Serves a quiz question from the difficulty buckets, so each pick avoids a category query.
+    def get_quiz_question_by_difficulty(body, previous_questions, quiz_category, difficulty, adaptive):
+        previous_correct = body.get('previous_correct', None)
+        if difficulty is None:
+            difficulty = DEFAULT_DIFFICULTY
+        if isinstance(difficulty, bool) or not isinstance(difficulty, int) or difficulty not in DIFFICULTY_LEVELS:
+            abort(422)
+        if previous_correct is not None and not isinstance(previous_correct, bool):
+            abort(422)
+        try:
+            if adaptive:
+                difficulty = next_difficulty(difficulty, previous_correct)
+            category_id = 0 if quiz_category is None else int(quiz_category['id'])
+
+            # Adaptive play falls back to the nearest difficulty once a bucket runs out.
+            if adaptive:
+                levels = sorted(DIFFICULTY_LEVELS, key=lambda level: abs(level - difficulty))
+            else:
+                levels = [difficulty]
+            difficulty_buckets = app.config['DIFFICULTY_BUCKETS']
+            excluded = set(previous_questions)
+            question = None
+            for level in levels:
+                bucket = difficulty_buckets.get((category_id, level))
+                if not bucket:
+                    continue
+                # A stale id (deleted by another worker or directly in the DB) is skipped, not served.
+                while question is None:
+                    question_id = pick_from_bucket(bucket, excluded)
+                    if question_id is None:
+                        break
+                    question = Question.query.get(question_id)
+                    excluded.add(question_id)
+                if question is not None:
+                    break
+
+            return jsonify({
+                'success': True,
+                'question': question.format() if question is not None else None,
+                'difficulty': difficulty
+            })
+        except:
+            abort(422)
  
     """
     Create error handlers for all expected errors including 404 and 422.
@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import random
+import statistics
+import tempfile
+
+from app import create_app, DIFFICULTY_LEVELS
+from models import db, Question, Category
+
+NUM_CATEGORIES = 6
+NUM_QUESTIONS = 20000
+WARMUP_ROUNDS = 20
+ROUNDS = 200
+# Adaptive selection may be at most this much slower than random selection.
+TOLERANCE = 0.10
+
+
+# Fills an empty database with categories and randomly graded questions.
+def seed_questions(app):
+    with app.app_context():
+        db.session.add_all([Category(f"Category {id}") for id in range(1, NUM_CATEGORIES + 1)])
+        db.session.add_all([
+            Question(question=f"Question {id}?", answer=f"Answer {id}",
+                     category=random.randint(1, NUM_CATEGORIES), difficulty=random.choice(DIFFICULTY_LEVELS))
+            for id in range(NUM_QUESTIONS)
+        ])
+        db.session.commit()
+
+
+# Times one POST '/quizzes' request in milliseconds.
+def time_quiz_request(client, payload):
+    start = time.perf_counter()
+    res = client.post('/quizzes', json=payload)
+    elapsed = (time.perf_counter() - start) * 1000
+    if res.status_code != 200 or res.get_json()['question'] is None:
+        raise RuntimeError(f"quiz request failed with status {res.status_code}: {res.get_data(as_text=True)}")
+    return elapsed
+
+
+if __name__ == "__main__":
+    # Uses a throwaway SQLite database unless a database path is given, so the trivia database is never touched.
+    if len(sys.argv) > 1:
+        database_path = sys.argv[1]
+    else:
+        database_path = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    random.seed(0)
+    app = create_app({'DATABASE_PATH': database_path})
+    seed_questions(app)
+    # Rebuild the buckets now that the questions exist.
+    app = create_app({'DATABASE_PATH': database_path})
+    client = app.test_client()
+
+    random_payload = {'previous_questions': [], 'category': {'id': 1}}
+    adaptive_payload = {'previous_questions': [], 'category': {'id': 1},
+                        'adaptive': True, 'difficulty': 3, 'previous_correct': True}
+
+    for _ in range(WARMUP_ROUNDS):
+        time_quiz_request(client, random_payload)
+        time_quiz_request(client, adaptive_payload)
+
+    # Interleave the two modes so drift in the machine's load affects both equally.
+    random_timings = []
+    adaptive_timings = []
+    for _ in range(ROUNDS):
+        random_timings.append(time_quiz_request(client, random_payload))
+        adaptive_timings.append(time_quiz_request(client, adaptive_payload))
+
+    random_ms = statistics.median(random_timings)
+    adaptive_ms = statistics.median(adaptive_timings)
+    print(f"{NUM_QUESTIONS} questions, {NUM_CATEGORIES} categories, {WARMUP_ROUNDS} warm-up rounds, median of {ROUNDS}")
+    print(f"random selection:   {random_ms:.2f} ms")
+    print(f"adaptive selection: {adaptive_ms:.2f} ms")
+    if adaptive_ms > random_ms * (1 + TOLERANCE):
+        sys.exit(f"adaptive selection is slower than random selection by more than {TOLERANCE:.0%}")
+    print(f"adaptive selection is within {TOLERANCE:.0%} of random selection")
@@ -1,11 +1,13 @@
 import os
 import unittest
 import json
+import tempfile
 from flask_sqlalchemy import SQLAlchemy
 from unittest.mock import patch, Mock
+from types import SimpleNamespace
 
-from app import create_app
-from models import setup_db, Question, Category
+from app import create_app, build_difficulty_buckets, next_difficulty, pick_from_bucket
+from models import setup_db, db, Question, Category
 
 
 class TriviaTestCase(unittest.TestCase):
@@ -258,6 +260,227 @@ class TriviaTestCase(unittest.TestCase):
         self.assertEqual(data['success'], False)
         self.assertEqual(data['message'], 'unprocessable')
 
+    def test_get_adaptive_quiz_question(self):
+        """
+        Tests getting an adaptive quiz question after a correct answer.
+        Sends a POST request to '/quizzes' endpoint in adaptive mode with difficulty 2 and a correct previous answer.
+        Asserts that the status code is 200, success is True, the difficulty moved up to 3 and the question matches it.
+        """
+        res = self.client().post('/quizzes', json={'previous_questions': [], 'category': {'id': 3},
+                                                   'adaptive': True, 'difficulty': 2, 'previous_correct': True})
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['success'], True)
+        self.assertEqual(data['difficulty'], 3)
+        self.assertEqual(data['question']['difficulty'], 3)
+        self.assertEqual(data['question']['category'], 3)
+
+    def test_422_get_quiz_question_invalid_difficulty(self):
+        """
+        Tests getting a quiz question with a difficulty outside the 1-5 range.
+        Sends a POST request to '/quizzes' endpoint with difficulty 9.
+        Asserts that the status code is 422, success is False, and the message is 'unprocessable'.
+        """
+        res = self.client().post('/quizzes', json={'previous_questions': [], 'category': {'id': 3}, 'difficulty': 9})
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 422)
+        self.assertEqual(data['success'], False)
+        self.assertEqual(data['message'], 'unprocessable')
+
+    def test_adaptive_quiz_steps_down_after_wrong_answer(self):
+        """
+        Tests that adaptive mode lowers the difficulty after a wrong answer.
+        Sends a POST request to '/quizzes' in adaptive mode with difficulty 3 and previous_correct False.
+        Asserts that the difficulty moved down to 2 and the question matches it.
+        """
+        res = self.client().post('/quizzes', json={'previous_questions': [], 'category': {'id': 3},
+                                                   'adaptive': True, 'difficulty': 3, 'previous_correct': False})
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['difficulty'], 2)
+        self.assertEqual(data['question']['difficulty'], 2)
+
+    def test_adaptive_quiz_clamps_difficulty(self):
+        """
+        Tests that adaptive mode keeps the difficulty between 1 and 5.
+        Sends a correct answer at difficulty 5 and a wrong answer at difficulty 1.
+        Asserts that the difficulty stays at 5 and 1 respectively.
+        """
+        res = self.client().post('/quizzes', json={'previous_questions': [], 'category': {'id': 1},
+                                                   'adaptive': True, 'difficulty': 5, 'previous_correct': True})
+        data = json.loads(res.data)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['difficulty'], 5)
+
+        res = self.client().post('/quizzes', json={'previous_questions': [], 'category': {'id': 2},
+                                                   'adaptive': True, 'difficulty': 1, 'previous_correct': False})
+        data = json.loads(res.data)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['difficulty'], 1)
+        self.assertEqual(data['question']['difficulty'], 1)
+
+    def test_adaptive_quiz_falls_back_to_nearest_difficulty(self):
+        """
+        Tests that adaptive mode serves the nearest difficulty once the requested one is used up.
+        Category 3 has a single difficulty 3 question (id 14), which is passed as a previous question.
+        Asserts that the difficulty stays 3 and a difficulty 2 question is served.
+        """
+        res = self.client().post('/quizzes', json={'previous_questions': [14], 'category': {'id': 3},
+                                                   'adaptive': True, 'difficulty': 3})
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['difficulty'], 3)
+        self.assertEqual(data['question']['difficulty'], 2)
+
+    def test_adaptive_quiz_returns_none_when_exhausted(self):
+        """
+        Tests that adaptive mode returns no question once every difficulty in the category is played.
+        Asserts that the status code is 200, success is True and the question is None.
+        """
+        res = self.client().post('/quizzes', json={'previous_questions': [13, 14, 15], 'category': {'id': 3},
+                                                   'adaptive': True, 'difficulty': 3})
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['success'], True)
+        self.assertEqual(data['question'], None)
+
+    def test_quiz_with_difficulty_serves_only_that_level(self):
+        """
+        Tests that a non-adaptive difficulty request never falls back to another level.
+        Asserts that difficulty 2 serves a difficulty 2 question and that difficulty 3 returns None once id 14 is played.
+        """
+        res = self.client().post('/quizzes', json={'previous_questions': [], 'category': {'id': 3}, 'difficulty': 2})
+        data = json.loads(res.data)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['question']['difficulty'], 2)
+
+        res = self.client().post('/quizzes', json={'previous_questions': [14], 'category': {'id': 3}, 'difficulty': 3})
+        data = json.loads(res.data)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['question'], None)
+
+    def test_quiz_buckets_follow_create_and_delete(self):
+        """
+        Tests that questions created or deleted through '/questions' are reflected by the quiz.
+        Creates a difficulty 5 question in category 3, checks it is served, deletes it and checks it is gone.
+        """
+        res = self.client().post('/questions', json={'question': 'Bucket test question?', 'answer': 'Yes',
+                                                     'category': 3, 'difficulty': 5})
+        created = json.loads(res.data)['created']
+
+        res = self.client().post('/quizzes', json={'previous_questions': [], 'category': {'id': 3}, 'difficulty': 5})
+        data = json.loads(res.data)
+        self.assertEqual(data['question']['id'], created)
+
+        self.client().delete(f'/questions/{created}')
+        res = self.client().post('/quizzes', json={'previous_questions': [], 'category': {'id': 3}, 'difficulty': 5})
+        data = json.loads(res.data)
+        self.assertEqual(data['question'], None)
+
+    def test_422_adaptive_quiz_non_boolean_flags(self):
+        """
+        Tests that 'adaptive' and 'previous_correct' must be booleans.
+        Asserts that the string values "false" and "true" are rejected with 422.
+        """
+        res = self.client().post('/quizzes', json={'previous_questions': [], 'category': {'id': 3}, 'adaptive': 'false'})
+        self.assertEqual(res.status_code, 422)
+
+        res = self.client().post('/quizzes', json={'previous_questions': [], 'category': {'id': 3},
+                                                   'adaptive': True, 'difficulty': 2, 'previous_correct': 'true'})
+        self.assertEqual(res.status_code, 422)
+
+
+class DifficultyBucketTestCase(unittest.TestCase):
+    """This class tests the difficulty bucket helpers without a database"""
+
+    def test_build_difficulty_buckets(self):
+        """
+        Tests that questions are grouped by category and by the "ALL" category 0,
+        and that questions without a valid difficulty are skipped.
+        """
+        questions = [
+            SimpleNamespace(id=1, category=2, difficulty=3),
+            SimpleNamespace(id=2, category='2', difficulty=3),
+            SimpleNamespace(id=3, category=None, difficulty=1),
+            SimpleNamespace(id=4, category=2, difficulty=None),
+            SimpleNamespace(id=5, category=2, difficulty=9),
+            SimpleNamespace(id=6, category='Science', difficulty=1),
+            SimpleNamespace(id=7, category=2, difficulty='hard'),
+        ]
+        buckets = build_difficulty_buckets(questions)
+
+        self.assertEqual(buckets[(2, 3)], [1, 2])
+        self.assertEqual(buckets[(0, 3)], [1, 2])
+        self.assertEqual(buckets[(0, 1)], [3, 6])
+        self.assertEqual(len(buckets), 3)
+
+    def test_next_difficulty(self):
+        """
+        Tests that the difficulty steps up or down by one, stays put without an answer, and is clamped to 1-5.
+        """
+        self.assertEqual(next_difficulty(3, True), 4)
+        self.assertEqual(next_difficulty(3, False), 2)
+        self.assertEqual(next_difficulty(3, None), 3)
+        self.assertEqual(next_difficulty(5, True), 5)
+        self.assertEqual(next_difficulty(1, False), 1)
+
+    def test_pick_from_bucket(self):
+        """
+        Tests that previous questions are never picked and that an exhausted bucket returns None.
+        """
+        for _ in range(20):
+            self.assertEqual(pick_from_bucket([1, 2, 3], {1, 3}), 2)
+        self.assertEqual(pick_from_bucket([1, 2], {1, 2}), None)
+
+
+
+class NonNumericQuestionTestCase(unittest.TestCase):
+    """This class tests that rows with a non-numeric category or difficulty cannot break the API"""
+
+    def setUp(self):
+        """Create a throwaway SQLite database, since Postgres rejects these rows outright."""
+        self.test_config = {'DATABASE_PATH': 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'trivia_test.db')}
+        self.app = create_app(self.test_config)
+        with self.app.app_context():
+            db.session.add(Category('Science'))
+            db.session.add(Question(question='Bad category?', answer='Yes', category='Science', difficulty=2))
+            db.session.add(Question(question='Bad difficulty?', answer='Yes', category=1, difficulty='hard'))
+            db.session.commit()
+
+    def test_create_app_with_non_numeric_rows(self):
+        """
+        Tests that the app starts when the database holds non-numeric category and difficulty values.
+        Asserts that the quiz still serves the question with a non-numeric category from the "ALL" bucket.
+        """
+        client = create_app(self.test_config).test_client()
+        res = client.post('/quizzes', json={'previous_questions': [], 'difficulty': 2})
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['question']['category'], 'Science')
+
+    def test_create_question_with_non_numeric_fields(self):
+        """
+        Tests creating questions with a non-numeric category or difficulty through '/questions'.
+        Asserts that both requests return 201 and the quiz keeps working afterwards.
+        """
+        client = create_app(self.test_config).test_client()
+        res = client.post('/questions', json={'question': 'Another?', 'answer': 'Yes',
+                                              'category': 'Science', 'difficulty': 4})
+        self.assertEqual(res.status_code, 201)
+        res = client.post('/questions', json={'question': 'Harder?', 'answer': 'Yes',
+                                              'category': 1, 'difficulty': 'hard'})
+        self.assertEqual(res.status_code, 201)
+
+        res = client.post('/quizzes', json={'previous_questions': [], 'difficulty': 4})
+        data = json.loads(res.data)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['question']['question'], 'Another?')
 
 
 # Make the tests conveniently executable
@@ -16,6 +16,8 @@ class QuizView extends Component {
       currentQuestion: {},
       guess: '',
       forceEnd: false,
+      difficulty: null,
+      previousCorrect: null,
     };
   }
 
@@ -55,7 +57,10 @@ class QuizView extends Component {
       contentType: 'application/json',
       data: JSON.stringify({
         previous_questions: previousQuestions,
-        quiz_category: this.state.quizCategory,
+        category: this.state.quizCategory,
+        adaptive: true,
+        difficulty: this.state.difficulty,
+        previous_correct: this.state.previousCorrect,
       }),
       xhrFields: {
         withCredentials: true,
@@ -68,6 +73,7 @@ class QuizView extends Component {
           currentQuestion: result.question,
           guess: '',
           forceEnd: result.question ? false : true,
+          difficulty: result.difficulty,
         });
         return;
       },
@@ -84,6 +90,7 @@ class QuizView extends Component {
     this.setState({
       numCorrect: !evaluate ? this.state.numCorrect : this.state.numCorrect + 1,
       showAnswer: true,
+      previousCorrect: evaluate,
     });
   };
 
@@ -96,6 +103,8 @@ class QuizView extends Component {
       currentQuestion: {},
       guess: '',
       forceEnd: false,
+      difficulty: null,
+      previousCorrect: null,
     });
   };
 